@@ -1,3 +1,3 @@
 """Core package for the autonomous data science research tool."""
 
-from .pipeline import ResearchPipeline  # noqa: F401
+from .pipeline import AsyncResearchPipeline, ResearchPipeline  # noqa: F401
@@ -0,0 +1,20 @@
+"""Shared OpenAI client construction."""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=8)
+def get_client(organization: Optional[str] = None, project: Optional[str] = None) -> Any:
+    """Return a process-wide ``openai.OpenAI`` client for the given credentials.
+
+    Components that are built without an explicit client share one instance,
+    and with it one HTTP connection pool, so keep-alive connections are reused
+    instead of each component paying its own TCP/TLS handshakes. Async clients
+    are not shared this way because their connection pool is bound to the
+    event loop that first used it.
+    """
+    from openai import OpenAI as OpenAIClient
+
+    return OpenAIClient(organization=organization, project=project)
@@ -0,0 +1,33 @@
+"""JSON helpers that use ``orjson`` when it is installed.
+
+``orjson`` parses and serialises several times faster than the standard
+library and works on bytes directly. Malformed input raises ``ValueError``
+either way: usually ``json.JSONDecodeError`` (which ``orjson.JSONDecodeError``
+subclasses), but the standard library raises ``UnicodeDecodeError`` for bytes
+that are not valid UTF-8.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - depends on the optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - depends on the optional dependency
+    orjson = None
+
+
+def dumps(value: Any, *, indent: bool = False) -> bytes:
+    """Serialise ``value`` to UTF-8 encoded JSON, optionally indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(
+            value, option=orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        )
+    return json.dumps(value, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document from bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -29,6 +29,11 @@ class EmbeddingConfig:
     """Configuration for the embedding generator."""
 
     model: str = "text-embedding-3-large"
+    batch_size: int = 256
+    max_workers: int = 5
+    max_retries: int = 5
+    cache_dir: Optional[str] = ".artifacts/embed_cache"
+    memory_cache_size: int = 4096
 
 
 @dataclass(slots=True)
@@ -37,6 +42,17 @@ class VectorStoreConfig:
 
     dimension: int = 3072
     similarity_top_k: int = 5
+    quantize: bool = False
+    hnsw_threshold: Optional[int] = 10_000
+
+
+@dataclass(slots=True)
+class SemanticCacheConfig:
+    """Configuration for the semantic cache in front of the pipeline."""
+
+    enabled: bool = True
+    similarity_threshold: float = 0.95
+    ttl_seconds: Optional[float] = 24 * 60 * 60
 
 
 @dataclass(slots=True)
@@ -46,6 +62,7 @@ class PipelineConfig:
     agent: AgentConfig = field(default_factory=AgentConfig)
     embeddings: EmbeddingConfig = field(default_factory=EmbeddingConfig)
     vector_store: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    semantic_cache: SemanticCacheConfig = field(default_factory=SemanticCacheConfig)
     summary_model: Optional[str] = "gpt-4.1-mini"
     organization: Optional[str] = None
     project: Optional[str] = None
@@ -1,8 +1,20 @@
 """Embedding utilities for the research pipeline."""
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, TYPE_CHECKING, Any
+import asyncio
+import dbm
+import hashlib
+import random
+import shelve
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, TYPE_CHECKING, Any
 
+import numpy as np
+
+from ._client import get_client
 from .config import EmbeddingConfig
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
@@ -10,7 +22,20 @@ if TYPE_CHECKING:  # pragma: no cover - typing only
 
 
 class EmbeddingService:
-    """Wrapper around the OpenAI embeddings endpoint."""
+    """Wrapper around the OpenAI embeddings endpoint.
+
+    Inputs larger than ``config.batch_size`` are split into batches that are
+    sent concurrently (bounded by ``config.max_workers``); results are returned
+    in input order. Rate-limited requests are retried with exponential backoff,
+    honouring the server's ``Retry-After`` header when present.
+
+    Embeddings are cached by ``sha256(model, text)``: first in a small
+    in-process LRU, then in an on-disk ``shelve`` database under
+    ``config.cache_dir`` (stored as float16 to halve its size). Only cache
+    misses are sent to the API. The database is opened on first use and kept
+    open, locked against other processes, until :meth:`close`; a service that
+    cannot take the lock or open the database uses the in-process LRU alone.
+    """
 
     def __init__(
         self,
@@ -22,15 +47,268 @@ class EmbeddingService:
     ) -> None:
         self.config = config
         if client is None:
-            from openai import OpenAI as OpenAIClient
-
-            client = OpenAIClient(organization=organization, project=project)
+            client = get_client(organization, project)
         self.client = client
+        self._memory_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._disk_cache: Optional[Any] = None
+        self._cache_lock: Optional[IO[bytes]] = None
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """Return a ``(N, D)`` float32 matrix with one embedding row per input text."""
+        inputs = list(texts)
+        if not inputs:
+            return np.empty((0, 0), dtype=np.float32)
+        keys, rows, missing = self._lookup(inputs)
+        if missing:
+            fetched = self._embed_uncached([inputs[index] for index in missing])
+            self._store(keys, rows, missing, fetched)
+            if len(missing) == len(inputs):
+                return fetched
+        return np.stack(rows)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        """Close the on-disk cache, releasing it for other processes."""
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+            self._disk_cache = None
+        if self._cache_lock is not None:
+            self._cache_lock.close()
+            self._cache_lock = None
+
+    def __enter__(self) -> "EmbeddingService":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # caching helpers
+    # ------------------------------------------------------------------
+    def _lookup(
+        self, inputs: List[str]
+    ) -> tuple[List[str], List[Optional[np.ndarray]], List[int]]:
+        """Return cache keys, cached rows (``None`` for misses), and miss indices."""
+        keys = [self._cache_key(text) for text in inputs]
+        disk_cache = self._open_disk_cache()
+        rows = [self._cache_get(disk_cache, key) for key in keys]
+        missing = [index for index, row in enumerate(rows) if row is None]
+        return keys, rows, missing
+
+    def _store(
+        self,
+        keys: List[str],
+        rows: List[Optional[np.ndarray]],
+        missing: List[int],
+        fetched: np.ndarray,
+    ) -> None:
+        disk_cache = self._open_disk_cache()
+        for index, row in zip(missing, fetched, strict=True):
+            rows[index] = row
+            self._cache_put(disk_cache, keys[index], row)
+        # Make the new entries visible to services opened after this one.
+        disk_cache.sync()
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.config.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _open_disk_cache(self) -> Any:
+        """Return the on-disk cache, opening it on first use."""
+        if self._disk_cache is None:
+            self._disk_cache = _NullCache()
+            if self.config.cache_dir:
+                cache_dir = Path(self.config.cache_dir)
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                self._cache_lock = _try_lock(cache_dir / "embeddings.lock")
+                if self._cache_lock is not None:
+                    try:
+                        self._disk_cache = shelve.open(str(cache_dir / "embeddings"))
+                    except dbm.error:  # includes OSError and each backend's lock errors
+                        self._cache_lock.close()
+                        self._cache_lock = None
+        return self._disk_cache
+
+    def _cache_get(self, disk_cache: Any, key: str) -> Optional[np.ndarray]:
+        embedding = self._memory_cache.get(key)
+        if embedding is not None:
+            self._memory_cache.move_to_end(key)
+            return embedding
+        stored = disk_cache.get(key)
+        if stored is None:
+            return None
+        embedding = np.asarray(stored, dtype=np.float32)
+        self._remember(key, embedding)
+        return embedding
+
+    def _cache_put(self, disk_cache: Any, key: str, embedding: np.ndarray) -> None:
+        disk_cache[key] = embedding.astype(np.float16)
+        # Copy so the cached row does not keep the whole response matrix alive.
+        self._remember(key, embedding.copy())
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        self._memory_cache[key] = embedding
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > self.config.memory_cache_size:
+            self._memory_cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # API helpers
+    # ------------------------------------------------------------------
+    def _embed_uncached(self, inputs: List[str]) -> np.ndarray:
+        batch_size = max(1, self.config.batch_size)
+        batches = [
+            inputs[start : start + batch_size] for start in range(0, len(inputs), batch_size)
+        ]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        workers = max(1, min(self.config.max_workers, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # ``map`` yields results in submission order, so rows stay aligned
+            # with ``inputs``.
+            return np.concatenate(list(executor.map(self._embed_batch_with_jitter, batches)))
+
+    def _embed_batch_with_jitter(self, batch: List[str]) -> np.ndarray:
+        # Spread concurrent requests out slightly so they do not hit the rate
+        # limiter at exactly the same instant.
+        time.sleep(random.uniform(0, 0.05))
+        return self._embed_batch(batch)
+
+    def _embed_batch(self, batch: List[str]) -> np.ndarray:
+        delay = 1.0
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                response = self.client.embeddings.create(model=self.config.model, input=batch)
+            except Exception as exc:
+                if attempt == self.config.max_retries or not _is_rate_limit(exc):
+                    raise
+                time.sleep(_backoff_delay(exc, delay))
+                delay *= 2
+                continue
+            return _response_matrix(response)
+        raise AssertionError("unreachable")  # pragma: no cover - loop always returns or raises
+
+
+class AsyncEmbeddingService(EmbeddingService):
+    """Variant of :class:`EmbeddingService` driven by an ``openai.AsyncOpenAI`` client.
+
+    Batches are awaited concurrently, bounded by ``config.max_workers``
+    in-flight requests; caching behaves exactly as in the synchronous service.
+    """
+
+    def __init__(
+        self,
+        config: EmbeddingConfig,
+        *,
+        client: Optional[Any] = None,
+        organization: Optional[str] = None,
+        project: Optional[str] = None,
+    ) -> None:
+        if client is None:
+            from openai import AsyncOpenAI as AsyncOpenAIClient
 
-    def embed(self, texts: Iterable[str]) -> List[List[float]]:
+            client = AsyncOpenAIClient(organization=organization, project=project)
+        super().__init__(config, client=client)
+
+    async def embed(self, texts: Iterable[str]) -> np.ndarray:  # type: ignore[override]
+        """Return a ``(N, D)`` float32 matrix with one embedding row per input text."""
         inputs = list(texts)
         if not inputs:
-            return []
-        response = self.client.embeddings.create(model=self.config.model, input=inputs)
-        embeddings = [list(item.embedding) for item in response.data]
-        return embeddings
+            return np.empty((0, 0), dtype=np.float32)
+        keys, rows, missing = self._lookup(inputs)
+        if missing:
+            fetched = await self._aembed_uncached([inputs[index] for index in missing])
+            self._store(keys, rows, missing, fetched)
+            if len(missing) == len(inputs):
+                return fetched
+        return np.stack(rows)  # type: ignore[arg-type]
+
+    async def _aembed_uncached(self, inputs: List[str]) -> np.ndarray:
+        batch_size = max(1, self.config.batch_size)
+        batches = [
+            inputs[start : start + batch_size] for start in range(0, len(inputs), batch_size)
+        ]
+        if len(batches) == 1:
+            return await self._aembed_batch(batches[0])
+        semaphore = asyncio.Semaphore(max(1, self.config.max_workers))
+
+        async def bounded(batch: List[str]) -> np.ndarray:
+            async with semaphore:
+                await asyncio.sleep(random.uniform(0, 0.05))
+                return await self._aembed_batch(batch)
+
+        # ``gather`` returns results in submission order.
+        return np.concatenate(await asyncio.gather(*(bounded(batch) for batch in batches)))
+
+    async def _aembed_batch(self, batch: List[str]) -> np.ndarray:
+        delay = 1.0
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.config.model, input=batch
+                )
+            except Exception as exc:
+                if attempt == self.config.max_retries or not _is_rate_limit(exc):
+                    raise
+                await asyncio.sleep(_backoff_delay(exc, delay))
+                delay *= 2
+                continue
+            return _response_matrix(response)
+        raise AssertionError("unreachable")  # pragma: no cover - loop always returns or raises
+
+
+class _NullCache(dict):
+    """Stand-in for the disk cache when ``cache_dir`` is disabled or unavailable."""
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        return None
+
+    def sync(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def _try_lock(path: Path) -> Optional[IO[bytes]]:
+    """Return ``path`` opened and exclusively locked, or ``None`` if another process holds it.
+
+    Not every ``dbm`` backend locks its files, and the pure-Python fallback
+    corrupts its index under concurrent writers. Without ``fcntl`` (Windows)
+    the file is opened unlocked.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return path.open("ab")
+    file = path.open("ab")
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        file.close()
+        return None
+    return file
+
+
+def _response_matrix(response: Any) -> np.ndarray:
+    return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+
+def _backoff_delay(exc: Exception, delay: float) -> float:
+    """Honour ``Retry-After`` when present, otherwise jittered exponential backoff."""
+    retry_after = _retry_after(exc)
+    if retry_after is None:
+        return delay + random.uniform(0, delay / 2)
+    return retry_after
+
+
+def _is_rate_limit(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
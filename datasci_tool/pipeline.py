@@ -1,14 +1,21 @@
 """High level orchestration for the research workflow."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable, Optional, TYPE_CHECKING, Any
+from typing import Optional, TYPE_CHECKING, Any
 
+import numpy as np
+
+from ._client import get_client
 from .config import PipelineConfig
-from .embeddings import EmbeddingService
-from .research_agent import ResearchAgent, ResearchSnippet
-from .summary import SummaryGenerator
+from .embeddings import AsyncEmbeddingService, EmbeddingService
+from .research_agent import AsyncResearchAgent, ResearchAgent, ResearchSnippet
+from .semantic_cache import SemanticCache
+from .summary import AsyncSummaryGenerator, SummaryGenerator
 from .vector_store import LocalVectorStore, StoredDocument
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
@@ -37,17 +44,10 @@ class ResearchPipeline:
     ) -> None:
         self.config = config
         if client is None:
-            from openai import OpenAI as OpenAIClient
-
-            client = OpenAIClient(
-                organization=config.organization,
-                project=config.project,
-            )
+            client = get_client(config.organization, config.project)
         self.client = client
-        self.vector_store = LocalVectorStore(
-            persist_path=persist_path or Path(".artifacts/vector_store.json"),
-            vector_dimension=config.vector_store.dimension,
-        )
+        self.vector_store = _build_vector_store(config, persist_path)
+        self.semantic_cache = _build_semantic_cache(config, persist_path)
         self.research_agent = ResearchAgent(
             config=config.agent,
             client=self.client,
@@ -63,43 +63,273 @@ class ResearchPipeline:
         )
 
     def run(self, query: str) -> ResearchOutput:
-        """Execute the end-to-end workflow for a single user query."""
-        snippets = self.research_agent.research(query)
-        embeddings = self.embedding_service.embed(snippet.content for snippet in snippets)
-        documents: list[StoredDocument] = []
-        for snippet, embedding in zip(snippets, embeddings, strict=True):
-            document_id = snippet.url or snippet.title
-            documents.append(
-                StoredDocument(
-                    document_id=document_id,
-                    text=snippet.content,
-                    metadata={
-                        "title": snippet.title,
-                        "url": snippet.url,
-                        "summary": snippet.summary,
-                    },
-                    embedding=embedding,
-                )
+        """Execute the end-to-end workflow for a single user query.
+
+        When the semantic cache is enabled and holds a fresh result for an
+        equivalent query, that result is returned without running the agent.
+        """
+        if self.semantic_cache is not None:
+            query_embedding = self.embedding_service.embed([query])[0]
+            payload = self.semantic_cache.lookup(query_embedding)
+            if payload is not None:
+                return _output_from_payload(query, payload, self.vector_store)
+        deduplicator = _SnippetDeduplicator(self.vector_store)
+        snippets: list[ResearchSnippet] = []
+        new_snippets: list[ResearchSnippet] = []
+        bullet_points: list[str] = []
+        for snippet in self.research_agent.research(query):
+            if deduplicator.is_duplicate(snippet):
+                continue
+            snippets.append(snippet)
+            bullet_points.append(_bullet_point(snippet))
+            if deduplicator.needs_indexing(snippet):
+                new_snippets.append(snippet)
+        # The summary only needs the bullet points, so generate it in the
+        # background while the snippets are embedded and stored.
+        executor = ThreadPoolExecutor(max_workers=1)
+        summary_future = executor.submit(self._build_summary, query, bullet_points)
+        try:
+            # Embed the query alongside the snippets so a run costs one API round-trip;
+            # cached texts (such as a query already embedded for the semantic cache)
+            # are filtered out by the embedding service itself.
+            embeddings = self.embedding_service.embed(
+                [query, *(snippet.content for snippet in new_snippets)]
             )
-        self.vector_store.add(documents)
-        query_embedding = self.embedding_service.embed([query])[0]
-        similar_documents = self.vector_store.query(
-            query_embedding, self.config.vector_store.similarity_top_k
-        )
-        summary = self._build_summary(query, snippets)
-        return ResearchOutput(
+            query_embedding = embeddings[0]
+            documents = [
+                _snippet_document(snippet, embedding)
+                for snippet, embedding in zip(new_snippets, embeddings[1:], strict=True)
+            ]
+            self.vector_store.add(documents)
+            self.vector_store.flush()
+            similar_documents = self.vector_store.query(
+                query_embedding, self.config.vector_store.similarity_top_k
+            )
+            summary = summary_future.result()
+        finally:
+            # Surface an embedding or store error right away instead of waiting
+            # for the summary request to finish.
+            executor.shutdown(wait=False, cancel_futures=True)
+        output = ResearchOutput(
             query=query,
             snippets=snippets,
             summary=summary,
             similar_documents=list(similar_documents),
         )
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(query, query_embedding, _output_payload(output))
+        return output
 
-    def _build_summary(self, query: str, snippets: Iterable[ResearchSnippet]) -> str:
-        bullet_points = [
-            f"{snippet.title}: {snippet.summary or snippet.content[:200]}" for snippet in snippets
-        ]
+    def _build_summary(self, query: str, bullet_points: list[str]) -> str:
         if not bullet_points:
             return "No research findings were produced."
         if self.summary_generator is None:
             return "\n".join(bullet_points)
         return self.summary_generator.summarize(query, bullet_points)
+
+
+class AsyncResearchPipeline:
+    """Asynchronous counterpart of :class:`ResearchPipeline` using ``AsyncOpenAI``.
+
+    Independent steps overlap instead of running back to back: snippets are
+    embedded in ``batch_size`` batches while the agent is still streaming (at
+    most ``max_workers`` requests in flight), the query rides along with the
+    final batch, and the summary is generated while the vector store is being
+    written.
+    """
+
+    def __init__(
+        self,
+        config: PipelineConfig,
+        *,
+        client: Optional[Any] = None,
+        persist_path: Optional[Path] = None,
+    ) -> None:
+        self.config = config
+        if client is None:
+            from openai import AsyncOpenAI as AsyncOpenAIClient
+
+            client = AsyncOpenAIClient(
+                organization=config.organization,
+                project=config.project,
+            )
+        self.client = client
+        self.vector_store = _build_vector_store(config, persist_path)
+        self.semantic_cache = _build_semantic_cache(config, persist_path)
+        self.research_agent = AsyncResearchAgent(
+            config=config.agent,
+            client=self.client,
+        )
+        self.embedding_service = AsyncEmbeddingService(
+            config=config.embeddings,
+            client=self.client,
+        )
+        self.summary_generator = (
+            AsyncSummaryGenerator(config.summary_model, client=self.client)
+            if config.summary_model
+            else None
+        )
+
+    async def run(self, query: str) -> ResearchOutput:
+        """Execute the end-to-end workflow for a single user query."""
+        if self.semantic_cache is not None:
+            payload = self.semantic_cache.lookup(
+                (await self.embedding_service.embed([query]))[0]
+            )
+            if payload is not None:
+                return _output_from_payload(query, payload, self.vector_store)
+        batch_size = max(1, self.config.embeddings.batch_size)
+        semaphore = asyncio.Semaphore(max(1, self.config.embeddings.max_workers))
+
+        async def embed_batch(texts: list[str]) -> Any:
+            async with semaphore:
+                return await self.embedding_service.embed(texts)
+
+        embedding_tasks: list[asyncio.Task] = []
+        summary_task: Optional[asyncio.Task] = None
+        try:
+            deduplicator = _SnippetDeduplicator(self.vector_store)
+            snippets: list[ResearchSnippet] = []
+            new_snippets: list[ResearchSnippet] = []
+            bullet_points: list[str] = []
+            batch: list[str] = []
+            async for snippet in self.research_agent.iter_research(query):
+                if deduplicator.is_duplicate(snippet):
+                    continue
+                snippets.append(snippet)
+                bullet_points.append(_bullet_point(snippet))
+                if deduplicator.needs_indexing(snippet):
+                    new_snippets.append(snippet)
+                    batch.append(snippet.content)
+                    if len(batch) == batch_size:
+                        embedding_tasks.append(asyncio.create_task(embed_batch(batch)))
+                        batch = []
+            # As in the sync pipeline, the query shares the last request; when
+            # it was embedded for the semantic cache it is served from cache.
+            embedding_tasks.append(asyncio.create_task(embed_batch([*batch, query])))
+            summary_task = asyncio.create_task(self._build_summary(query, bullet_points))
+            embeddings = np.concatenate(await asyncio.gather(*embedding_tasks))
+            query_embedding = embeddings[-1]
+            documents = [
+                _snippet_document(snippet, embedding)
+                for snippet, embedding in zip(new_snippets, embeddings[:-1], strict=True)
+            ]
+            self.vector_store.add(documents)
+            await asyncio.to_thread(self.vector_store.flush)
+            similar_documents = self.vector_store.query(
+                query_embedding, self.config.vector_store.similarity_top_k
+            )
+            summary = await summary_task
+        finally:
+            for task in (*embedding_tasks, summary_task):
+                if task is not None:
+                    task.cancel()
+        output = ResearchOutput(
+            query=query,
+            snippets=snippets,
+            summary=summary,
+            similar_documents=list(similar_documents),
+        )
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(
+                self.semantic_cache.add, query, query_embedding, _output_payload(output)
+            )
+        return output
+
+    async def _build_summary(self, query: str, bullet_points: list[str]) -> str:
+        if not bullet_points:
+            return "No research findings were produced."
+        if self.summary_generator is None:
+            return "\n".join(bullet_points)
+        return await self.summary_generator.summarize(query, bullet_points)
+
+
+class _SnippetDeduplicator:
+    """Filters repeated snippets and snippets that are already in the vector store."""
+
+    def __init__(self, vector_store: LocalVectorStore) -> None:
+        self._vector_store = vector_store
+        self._seen: set[tuple[str, str]] = set()
+        self._indexed_ids: set[str] = set()
+
+    def is_duplicate(self, snippet: ResearchSnippet) -> bool:
+        """Return ``True`` for a repeat of an earlier snippet with the same URL and content."""
+        key = (snippet.url, hashlib.sha256(snippet.content.encode("utf-8")).hexdigest())
+        if key in self._seen:
+            return True
+        self._seen.add(key)
+        return False
+
+    def needs_indexing(self, snippet: ResearchSnippet) -> bool:
+        """Return ``True`` when the snippet's document is not stored or queued yet."""
+        document_id = _document_id(snippet)
+        if document_id in self._indexed_ids or document_id in self._vector_store:
+            return False
+        self._indexed_ids.add(document_id)
+        return True
+
+
+def _build_vector_store(config: PipelineConfig, persist_path: Optional[Path]) -> LocalVectorStore:
+    return LocalVectorStore(
+        persist_path=persist_path or Path(".artifacts/vector_store.json"),
+        vector_dimension=config.vector_store.dimension,
+        quantize=config.vector_store.quantize,
+        hnsw_threshold=config.vector_store.hnsw_threshold,
+    )
+
+
+def _build_semantic_cache(
+    config: PipelineConfig, persist_path: Optional[Path]
+) -> Optional[SemanticCache]:
+    if not config.semantic_cache.enabled:
+        return None
+    store_path = persist_path or Path(".artifacts/vector_store.json")
+    return SemanticCache(
+        store_path.with_name(f"{store_path.stem}.semantic_cache.json"),
+        config.vector_store.dimension,
+        threshold=config.semantic_cache.similarity_threshold,
+        ttl_seconds=config.semantic_cache.ttl_seconds,
+    )
+
+
+def _output_payload(output: ResearchOutput) -> dict:
+    return {
+        "snippets": [asdict(snippet) for snippet in output.snippets],
+        "summary": output.summary,
+        "similar_document_ids": [doc.document_id for doc in output.similar_documents],
+    }
+
+
+def _output_from_payload(
+    query: str, payload: dict, vector_store: LocalVectorStore
+) -> ResearchOutput:
+    similar_documents = [
+        vector_store.get(document_id) for document_id in payload["similar_document_ids"]
+    ]
+    return ResearchOutput(
+        query=query,
+        snippets=[ResearchSnippet(**snippet) for snippet in payload["snippets"]],
+        summary=payload["summary"],
+        similar_documents=[doc for doc in similar_documents if doc is not None],
+    )
+
+
+def _snippet_document(snippet: ResearchSnippet, embedding: Any) -> StoredDocument:
+    return StoredDocument(
+        document_id=_document_id(snippet),
+        text=snippet.content,
+        metadata={
+            "title": snippet.title,
+            "url": snippet.url,
+            "summary": snippet.summary,
+        },
+        embedding=embedding,
+    )
+
+
+def _document_id(snippet: ResearchSnippet) -> str:
+    return snippet.url or snippet.title
+
+
+def _bullet_point(snippet: ResearchSnippet) -> str:
+    return f"{snippet.title}: {snippet.summary or snippet.content[:200]}"
@@ -1,9 +1,11 @@
 """Utilities for interacting with the OpenAI Agent API."""
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, TYPE_CHECKING, Any
+from typing import AsyncIterator, Iterator, List, Optional, TYPE_CHECKING, Any
 
+from ._client import get_client
 from .config import AgentConfig
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
@@ -33,27 +35,27 @@ class ResearchAgent:
     ) -> None:
         self.config = config
         if client is None:
-            from openai import OpenAI as OpenAIClient
-
-            client = OpenAIClient(organization=organization, project=project)
+            client = get_client(organization, project)
         self.client = client
         self._agent_id = self._ensure_agent()
 
     def _ensure_agent(self) -> str:
-        agent = self.client.agents.create(
-            name="Autonomous Data Science Researcher",
-            model=self.config.model,
-            instructions=self.config.instructions,
-            tools=self.config.tools,
-        )
+        agent = self.client.agents.create(**self._agent_kwargs())
         return agent.id
 
-    def research(self, query: str) -> List[ResearchSnippet]:
-        session = self.client.agents.sessions.create(agent_id=self._agent_id)
-        with self.client.responses.stream(
-            model=self.config.model,
-            modalities=["text"],
-            input=[
+    def _agent_kwargs(self) -> dict:
+        return {
+            "name": "Autonomous Data Science Researcher",
+            "model": self.config.model,
+            "instructions": self.config.instructions,
+            "tools": self.config.tools,
+        }
+
+    def _stream_kwargs(self, query: str, session_id: str) -> dict:
+        return {
+            "model": self.config.model,
+            "modalities": ["text"],
+            "input": [
                 {
                     "role": "user",
                     "content": [
@@ -70,38 +72,157 @@ class ResearchAgent:
                     ],
                 }
             ],
-            session_id=session.id,
-            stream=True,
-        ) as stream:
-            buffer: list[str] = []
+            "session_id": session_id,
+            "stream": True,
+        }
+
+    def research(self, query: str) -> List[ResearchSnippet]:
+        return list(self.iter_research(query))
+
+    def iter_research(self, query: str) -> Iterator[ResearchSnippet]:
+        """Yield snippets as soon as each element of the streamed JSON array closes."""
+        session = self.client.agents.sessions.create(agent_id=self._agent_id)
+        parser = _JSONArrayStreamParser()
+        index = 0
+        with self.client.responses.stream(**self._stream_kwargs(query, session.id)) as stream:
             for event in stream:
                 if event.type == "response.output_text.delta":
-                    buffer.append(event.delta)
+                    for item in parser.feed(event.delta):
+                        yield self._to_snippet(index, item)
+                        index += 1
                 elif event.type == "response.completed":
                     break
             stream.close()
-        text = "".join(buffer).strip()
-        snippets = self._parse_json_array(text)
-        return snippets
-
-    def _parse_json_array(self, text: str) -> List[ResearchSnippet]:
-        import json
+        parser.close()
 
+    def _to_snippet(self, idx: int, item: Any) -> ResearchSnippet:
         try:
-            raw: Iterable[dict] = json.loads(text)
-        except json.JSONDecodeError as exc:  # pragma: no cover - defensive branch
-            raise RuntimeError(f"Agent response was not valid JSON: {text[:1000]}") from exc
-        snippets: List[ResearchSnippet] = []
-        for idx, item in enumerate(raw):
+            return ResearchSnippet(
+                title=item["title"],
+                url=item.get("url", ""),
+                content=item.get("content", item.get("body", "")),
+                summary=item.get("summary", ""),
+            )
+        except (KeyError, AttributeError, TypeError) as exc:
+            raise RuntimeError(f"Missing key in snippet #{idx}: {item}") from exc
+
+
+class AsyncResearchAgent(ResearchAgent):
+    """Variant of :class:`ResearchAgent` driven by an ``openai.AsyncOpenAI`` client.
+
+    The remote agent is created lazily on the first research call because
+    ``__init__`` cannot await it.
+    """
+
+    def __init__(
+        self,
+        config: AgentConfig,
+        *,
+        client: Optional[Any] = None,
+        organization: Optional[str] = None,
+        project: Optional[str] = None,
+    ) -> None:
+        self.config = config
+        if client is None:
+            from openai import AsyncOpenAI as AsyncOpenAIClient
+
+            client = AsyncOpenAIClient(organization=organization, project=project)
+        self.client = client
+        self._agent_id: Optional[str] = None
+
+    async def _aensure_agent(self) -> str:
+        if self._agent_id is None:
+            agent = await self.client.agents.create(**self._agent_kwargs())
+            self._agent_id = agent.id
+        return self._agent_id
+
+    async def research(self, query: str) -> List[ResearchSnippet]:  # type: ignore[override]
+        return [snippet async for snippet in self.iter_research(query)]
+
+    async def iter_research(  # type: ignore[override]
+        self, query: str
+    ) -> AsyncIterator[ResearchSnippet]:
+        """Asynchronously yield snippets as each streamed array element closes."""
+        agent_id = await self._aensure_agent()
+        session = await self.client.agents.sessions.create(agent_id=agent_id)
+        parser = _JSONArrayStreamParser()
+        index = 0
+        async with self.client.responses.stream(
+            **self._stream_kwargs(query, session.id)
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    for item in parser.feed(event.delta):
+                        yield self._to_snippet(index, item)
+                        index += 1
+                elif event.type == "response.completed":
+                    break
+            await stream.close()
+        parser.close()
+
+
+class _JSONArrayStreamParser:
+    """Incrementally decode the elements of a JSON array from text chunks.
+
+    Consumed text is discarded as soon as an element has been decoded, so the
+    buffer only ever holds the element currently being streamed.
+    """
+
+    _PREVIEW_LENGTH = 1000
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._preview = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> Iterator[Any]:
+        if len(self._preview) < self._PREVIEW_LENGTH:
+            self._preview = (self._preview + chunk)[: self._PREVIEW_LENGTH]
+        if self._finished:
+            return
+        self._buffer += chunk
+        # Objects and arrays can only complete on a closing bracket, so skip
+        # re-decoding the pending element until one arrives.
+        may_close = "}" in chunk or "]" in chunk
+        pos = 0
+        while True:
+            pos = self._skip_separators(pos)
+            if pos >= len(self._buffer):
+                break
+            if not self._started:
+                if self._buffer[pos] != "[":
+                    self._fail()
+                self._started = True
+                pos += 1
+                continue
+            if self._buffer[pos] == "]":
+                self._finished = True
+                pos = len(self._buffer)
+                break
+            if not may_close:
+                break
             try:
-                snippets.append(
-                    ResearchSnippet(
-                        title=item["title"],
-                        url=item.get("url", ""),
-                        content=item.get("content", item.get("body", "")),
-                        summary=item.get("summary", ""),
-                    )
-                )
-            except KeyError as exc:  # pragma: no cover - defensive branch
-                raise RuntimeError(f"Missing key in snippet #{idx}: {item}") from exc
-        return snippets
+                item, end = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                break  # the element is still being streamed
+            if end == len(self._buffer) and self._buffer[pos] not in '{["':
+                break  # a bare number or literal may continue in the next chunk
+            yield item
+            pos = end
+        self._buffer = self._buffer[pos:]
+
+    def close(self) -> None:
+        if not self._finished:
+            self._fail()
+
+    def _skip_separators(self, pos: int) -> int:
+        while pos < len(self._buffer) and (
+            self._buffer[pos].isspace() or (self._started and self._buffer[pos] == ",")
+        ):
+            pos += 1
+        return pos
+
+    def _fail(self) -> None:
+        raise RuntimeError(f"Agent response was not valid JSON: {self._preview}")
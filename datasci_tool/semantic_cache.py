@@ -0,0 +1,91 @@
+"""Semantic caching of pipeline results keyed on query embeddings."""
+from __future__ import annotations
+
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .vector_store import LocalVectorStore, StoredDocument
+
+
+class SemanticCache:
+    """Reuse earlier results for queries whose embeddings are near-duplicates.
+
+    Entries live in their own :class:`LocalVectorStore` (so the store's HNSW
+    index kicks in once the cache grows large) with the cached payload kept in
+    the document metadata. A lookup returns the payload of the most similar
+    entry whose cosine similarity reaches ``threshold`` and which is younger
+    than ``ttl_seconds``. Lookups skip expired entries; adding an entry evicts
+    them and replaces any earlier entry for the same query, so the store only
+    grows with live results.
+    """
+
+    def __init__(
+        self,
+        persist_path: Path,
+        vector_dimension: int,
+        *,
+        threshold: float = 0.95,
+        ttl_seconds: Optional[float] = 24 * 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        # Exact float32 scores keep the similarity threshold meaningful.
+        self.store = LocalVectorStore(persist_path, vector_dimension, quantize=False)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    def lookup(self, embedding: np.ndarray | List[float], *, candidates: int = 5) -> Optional[dict]:
+        """Return the cached payload for a semantically equivalent query, if any."""
+        now = self._clock()
+        payload, saw_expired = self._best_match(embedding, candidates, now)
+        if payload is None and saw_expired:
+            # Expired near-duplicates may have crowded a fresh entry out of
+            # the candidate window; rank every entry instead.
+            payload, _ = self._best_match(embedding, len(self.store), now)
+        return payload
+
+    def add(self, query: str, embedding: np.ndarray | List[float], payload: dict) -> None:
+        """Cache ``payload`` (a JSON-serialisable dict) for ``query``, replacing older entries."""
+        self._evict(self._clock(), query=query)
+        self.store.add(
+            [
+                StoredDocument(
+                    document_id=uuid.uuid4().hex,
+                    text=query,
+                    metadata={"created_at": self._clock(), "payload": payload},
+                    embedding=np.asarray(embedding, dtype=np.float32),
+                )
+            ]
+        )
+        self.store.flush()
+
+    def _best_match(
+        self, embedding: np.ndarray | List[float], top_k: int, now: float
+    ) -> tuple[Optional[dict], bool]:
+        """Return the best live payload above the threshold and whether expired rows were seen."""
+        saw_expired = False
+        for document, score in self.store.search(embedding, top_k):
+            if score < self.threshold:
+                break
+            if self._expired(document, now):
+                saw_expired = True
+                continue
+            return document.metadata["payload"], saw_expired
+        return None, saw_expired
+
+    def _evict(self, now: float, *, query: Optional[str] = None) -> None:
+        """Drop expired entries, plus any cached for ``query``."""
+        self.store.discard(
+            document.document_id
+            for document in self.store.documents
+            if self._expired(document, now) or document.text == query
+        )
+
+    def _expired(self, document: StoredDocument, now: float) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return now - document.metadata.get("created_at", 0.0) > self.ttl_seconds
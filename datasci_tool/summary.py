@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from typing import Iterable, Optional, TYPE_CHECKING, Any
 
+from ._client import get_client
+
 if TYPE_CHECKING:  # pragma: no cover - typing only
     from openai import OpenAI  # noqa: F401
 
@@ -20,16 +22,18 @@ class SummaryGenerator:
     ) -> None:
         self.model = model
         if client is None:
-            from openai import OpenAI as OpenAIClient
-
-            client = OpenAIClient(organization=organization, project=project)
+            client = get_client(organization, project)
         self.client = client
 
     def summarize(self, query: str, bullet_points: Iterable[str]) -> str:
+        response = self.client.responses.create(**self._request_kwargs(query, bullet_points))
+        return response.output_text
+
+    def _request_kwargs(self, query: str, bullet_points: Iterable[str]) -> dict:
         bullets_text = "\n".join(f"- {point}" for point in bullet_points)
-        response = self.client.responses.create(
-            model=self.model,
-            input=[
+        return {
+            "model": self.model,
+            "input": [
                 {
                     "role": "user",
                     "content": [
@@ -45,5 +49,31 @@ class SummaryGenerator:
                     ],
                 }
             ],
+        }
+
+
+class AsyncSummaryGenerator(SummaryGenerator):
+    """Variant of :class:`SummaryGenerator` driven by an ``openai.AsyncOpenAI`` client."""
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        client: Optional[Any] = None,
+        organization: Optional[str] = None,
+        project: Optional[str] = None,
+    ) -> None:
+        self.model = model
+        if client is None:
+            from openai import AsyncOpenAI as AsyncOpenAIClient
+
+            client = AsyncOpenAIClient(organization=organization, project=project)
+        self.client = client
+
+    async def summarize(  # type: ignore[override]
+        self, query: str, bullet_points: Iterable[str]
+    ) -> str:
+        response = await self.client.responses.create(
+            **self._request_kwargs(query, bullet_points)
         )
         return response.output_text
@@ -2,9 +2,10 @@
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from pathlib import Path
 
+from datasci_tool import _json
 from datasci_tool.config import PipelineConfig
 from datasci_tool.pipeline import ResearchPipeline
 
@@ -46,7 +47,7 @@ def main() -> None:
             for doc in output.similar_documents
         ],
     }
-    print(json.dumps(result, indent=2))
+    sys.stdout.buffer.write(_json.dumps(result, indent=True) + b"\n")
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry point
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from datasci_tool._client import get_client
+from datasci_tool.config import EmbeddingConfig
+from datasci_tool.embeddings import EmbeddingService
+from datasci_tool.summary import SummaryGenerator
+
+
+def test_components_share_one_client_per_credentials():
+    fake_openai = SimpleNamespace(OpenAI=Mock(side_effect=lambda **kwargs: object()))
+    get_client.cache_clear()
+    try:
+        with patch.dict(sys.modules, {"openai": fake_openai}):
+            embeddings = EmbeddingService(EmbeddingConfig(cache_dir=None))
+            summary = SummaryGenerator("gpt-4.1-mini")
+            other = SummaryGenerator("gpt-4.1-mini", organization="org-2")
+    finally:
+        get_client.cache_clear()
+
+    assert embeddings.client is summary.client
+    assert other.client is not summary.client
+    assert fake_openai.OpenAI.call_count == 2
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import shelve
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from datasci_tool.config import EmbeddingConfig
+from datasci_tool.embeddings import AsyncEmbeddingService, EmbeddingService
+
+
+def _fake_create(*, model, input):
+    return SimpleNamespace(
+        data=[SimpleNamespace(embedding=[float(text), 0.0]) for text in input]
+    )
+
+
+def test_embed_batches_concurrently_and_preserves_order():
+    client = Mock()
+    client.embeddings.create.side_effect = _fake_create
+    service = EmbeddingService(
+        EmbeddingConfig(batch_size=3, max_workers=2, cache_dir=None), client=client
+    )
+
+    embeddings = service.embed(str(idx) for idx in range(10))
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.tolist() == [[float(idx), 0.0] for idx in range(10)]
+    assert client.embeddings.create.call_count == 4
+
+
+def test_embed_retries_rate_limited_requests():
+    rate_limited = Exception("rate limited")
+    rate_limited.status_code = 429
+    rate_limited.response = SimpleNamespace(headers={"retry-after": "0"})
+    client = Mock()
+    client.embeddings.create.side_effect = [rate_limited, _fake_create(model="m", input=["1"])]
+    service = EmbeddingService(EmbeddingConfig(cache_dir=None), client=client)
+
+    with patch("datasci_tool.embeddings.time.sleep") as sleep:
+        assert service.embed(["1"]).tolist() == [[1.0, 0.0]]
+
+    sleep.assert_called_once_with(0.0)
+
+
+def test_embed_serves_repeated_texts_from_cache(tmp_path):
+    client = Mock()
+    client.embeddings.create.side_effect = _fake_create
+    config = EmbeddingConfig(cache_dir=str(tmp_path / "cache"))
+
+    with EmbeddingService(config, client=client) as service:
+        first = service.embed(["1", "2"])
+    assert first.tolist() == [[1.0, 0.0], [2.0, 0.0]]
+    # A fresh service only has the on-disk cache to draw from.
+    fresh = EmbeddingService(config, client=client)
+    second = fresh.embed(["2", "3", "1"])
+    assert second.tolist() == [[2.0, 0.0], [3.0, 0.0], [1.0, 0.0]]
+
+    assert [call.kwargs["input"] for call in client.embeddings.create.call_args_list] == [
+        ["1", "2"],
+        ["3"],
+    ]
+
+
+def test_disk_cache_is_opened_once_and_falls_back_to_memory_when_locked(tmp_path):
+    pytest.importorskip("fcntl")
+    client = Mock()
+    client.embeddings.create.side_effect = _fake_create
+    config = EmbeddingConfig(cache_dir=str(tmp_path / "cache"))
+    service = EmbeddingService(config, client=client)
+
+    with patch("datasci_tool.embeddings.shelve.open", wraps=shelve.open) as open_shelf:
+        service.embed(["1"])
+        service.embed(["1", "2"])
+        # Another service cannot take the lock while this one holds the cache.
+        with EmbeddingService(config, client=client) as locked_out:
+            assert locked_out.embed(["3"]).tolist() == [[3.0, 0.0]]
+            assert locked_out.embed(["3"]).tolist() == [[3.0, 0.0]]
+
+    assert open_shelf.call_count == 1
+    assert client.embeddings.create.call_count == 3
+    service.close()
+    with EmbeddingService(config, client=client) as reopened:
+        assert reopened.embed(["2"]).tolist() == [[2.0, 0.0]]
+    assert client.embeddings.create.call_count == 3
+
+
+def test_async_embed_batches_concurrently_and_preserves_order():
+    client = Mock()
+    client.embeddings.create = AsyncMock(side_effect=_fake_create)
+    service = AsyncEmbeddingService(
+        EmbeddingConfig(batch_size=3, max_workers=2, cache_dir=None), client=client
+    )
+
+    embeddings = asyncio.run(service.embed(str(idx) for idx in range(7)))
+
+    assert embeddings.tolist() == [[float(idx), 0.0] for idx in range(7)]
+    assert client.embeddings.create.await_count == 3
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
-from unittest.mock import Mock, patch
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
-from datasci_tool.config import PipelineConfig, VectorStoreConfig
-from datasci_tool.pipeline import ResearchPipeline
+import numpy as np
+import pytest
+
+from datasci_tool.config import (
+    EmbeddingConfig,
+    PipelineConfig,
+    SemanticCacheConfig,
+    VectorStoreConfig,
+)
+from datasci_tool.pipeline import AsyncResearchPipeline, ResearchPipeline
 from datasci_tool.research_agent import ResearchSnippet
 
 
@@ -35,10 +47,14 @@ def test_pipeline_runs_end_to_end(tmp_path):
         mock_agent_instance.research.return_value = research_snippets
 
         mock_embedding = mock_embedding_service.return_value
-        mock_embedding.embed.side_effect = [
-            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
-            [[0.8, 0.2, 0.0]],
-        ]
+        mock_embedding.embed.return_value = np.array(
+            [
+                [0.8, 0.2, 0.0],
+                [1.0, 0.0, 0.0],
+                [0.0, 1.0, 0.0],
+            ],
+            dtype=np.float32,
+        )
 
         mock_summary = mock_summary_generator.return_value
         mock_summary.summarize.return_value = "final summary"
@@ -55,5 +71,250 @@ def test_pipeline_runs_end_to_end(tmp_path):
         assert output.snippets == research_snippets
         assert len(output.similar_documents) == 2
         assert mock_summary.summarize.called
-        assert mock_embedding.embed.called
+        # The query is embedded up front for the semantic cache lookup; the fused
+        # call then re-sends it, which the real service answers from its cache.
+        assert [call.args[0] for call in mock_embedding.embed.call_args_list] == [
+            ["Bayesian optimization use cases"],
+            [
+                "Bayesian optimization use cases",
+                "Detailed notes about article A",
+                "Insights from article B",
+            ],
+        ]
+        assert [doc.document_id for doc in output.similar_documents] == [
+            "https://example.com/a",
+            "https://example.com/b",
+        ]
         assert len(pipeline.vector_store) == 2
+
+
+def test_pipeline_does_not_wait_for_the_summary_when_embedding_fails(tmp_path):
+    config = PipelineConfig()
+    config.vector_store = VectorStoreConfig(dimension=3)
+    config.semantic_cache = SemanticCacheConfig(enabled=False)
+    snippet = ResearchSnippet(
+        title="A", url="https://example.com/a", content="Notes A", summary="A"
+    )
+    release = threading.Event()
+    summarized = threading.Event()
+
+    def summarize(*args):
+        release.wait(5)
+        summarized.set()
+        return "summary"
+
+    with (
+        patch("datasci_tool.pipeline.ResearchAgent") as mock_research_agent,
+        patch("datasci_tool.pipeline.EmbeddingService") as mock_embedding_service,
+        patch("datasci_tool.pipeline.SummaryGenerator") as mock_summary_generator,
+    ):
+        mock_research_agent.return_value.research.return_value = [snippet]
+        mock_embedding_service.return_value.embed.side_effect = RuntimeError("embedding failed")
+        mock_summary_generator.return_value.summarize.side_effect = summarize
+        pipeline = ResearchPipeline(config, client=Mock(), persist_path=tmp_path / "vectors.json")
+
+        try:
+            with pytest.raises(RuntimeError, match="embedding failed"):
+                pipeline.run("query")
+            assert not summarized.is_set()
+        finally:
+            release.set()
+
+
+def test_async_pipeline_runs_end_to_end(tmp_path):
+    config = PipelineConfig()
+    config.vector_store = VectorStoreConfig(dimension=3, similarity_top_k=1)
+
+    research_snippets = [
+        ResearchSnippet(
+            title="Article A",
+            url="https://example.com/a",
+            content="Detailed notes about article A",
+            summary="Key findings from A",
+        ),
+        ResearchSnippet(
+            title="Article B",
+            url="https://example.com/b",
+            content="Insights from article B",
+            summary="Highlights from B",
+        ),
+    ]
+    vectors = {
+        "Bayesian optimization use cases": [0.1, 0.9, 0.0],
+        "Detailed notes about article A": [1.0, 0.0, 0.0],
+        "Insights from article B": [0.0, 1.0, 0.0],
+    }
+
+    async def stream_snippets(query):
+        for snippet in research_snippets:
+            yield snippet
+
+    async def embed(texts):
+        return np.array([vectors[text] for text in texts], dtype=np.float32)
+
+    with (
+        patch("datasci_tool.pipeline.AsyncResearchAgent") as mock_research_agent,
+        patch("datasci_tool.pipeline.AsyncEmbeddingService") as mock_embedding_service,
+        patch("datasci_tool.pipeline.AsyncSummaryGenerator") as mock_summary_generator,
+    ):
+        mock_research_agent.return_value.iter_research = stream_snippets
+        mock_embedding_service.return_value.embed = embed
+        mock_summary = mock_summary_generator.return_value
+        mock_summary.summarize = AsyncMock(return_value="final summary")
+
+        pipeline = AsyncResearchPipeline(
+            config,
+            client=Mock(),
+            persist_path=tmp_path / "vectors.json",
+        )
+
+        output = asyncio.run(pipeline.run("Bayesian optimization use cases"))
+
+    assert output.summary == "final summary"
+    assert output.snippets == research_snippets
+    assert [doc.document_id for doc in output.similar_documents] == ["https://example.com/b"]
+    mock_summary.summarize.assert_awaited_once()
+    assert len(pipeline.vector_store) == 2
+
+
+def test_async_pipeline_embeds_streamed_snippets_in_bounded_batches(tmp_path):
+    config = PipelineConfig(summary_model=None)
+    config.vector_store = VectorStoreConfig(dimension=3, similarity_top_k=1)
+    config.embeddings = EmbeddingConfig(batch_size=2, max_workers=1, cache_dir=None)
+    config.semantic_cache = SemanticCacheConfig(enabled=False)
+    items = [
+        {"title": f"Article {idx}", "url": f"https://example.com/{idx}", "content": f"Notes {idx}"}
+        for idx in range(5)
+    ]
+    payload = json.dumps(items)
+    chunks = [payload[start : start + 16] for start in range(0, len(payload), 16)]
+    calls: list[list[str]] = []
+    in_flight = [0, 0]  # current, peak
+
+    class Stream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+        async def __aiter__(self):
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+            yield SimpleNamespace(type="response.completed")
+
+        async def close(self):
+            return None
+
+    async def create_embeddings(*, model, input):
+        calls.append(list(input))
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        vectors = [
+            [1.0, 0.0, 0.0] if text == "query" else [0.0, 1.0, float(text[-1])] for text in input
+        ]
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vector) for vector in vectors])
+
+    client = Mock()
+    client.agents.create = AsyncMock(return_value=SimpleNamespace(id="agent"))
+    client.agents.sessions.create = AsyncMock(return_value=SimpleNamespace(id="session"))
+    client.responses.stream = Mock(return_value=Stream())
+    client.embeddings.create = create_embeddings
+    pipeline = AsyncResearchPipeline(config, client=client, persist_path=tmp_path / "vectors.json")
+
+    output = asyncio.run(pipeline.run("query"))
+
+    assert [snippet.title for snippet in output.snippets] == [item["title"] for item in items]
+    assert calls == [["Notes 0", "Notes 1"], ["Notes 2", "Notes 3"], ["Notes 4", "query"]]
+    assert in_flight[1] == 1
+    assert len(pipeline.vector_store) == 5
+    assert pipeline.vector_store.get("https://example.com/3").text == "Notes 3"
+
+
+def test_pipeline_skips_duplicate_and_already_stored_snippets(tmp_path):
+    config = PipelineConfig()
+    config.vector_store = VectorStoreConfig(dimension=3, similarity_top_k=2)
+    config.semantic_cache = SemanticCacheConfig(enabled=False)
+    snippet_a = ResearchSnippet(
+        title="Article A", url="https://example.com/a", content="Notes A", summary="A"
+    )
+    snippet_b = ResearchSnippet(
+        title="Article B", url="https://example.com/b", content="Notes B", summary="B"
+    )
+    vectors = {"query": [0.5, 0.5, 0.0], "Notes A": [1.0, 0.0, 0.0], "Notes B": [0.0, 1.0, 0.0]}
+
+    with (
+        patch("datasci_tool.pipeline.ResearchAgent") as mock_research_agent,
+        patch("datasci_tool.pipeline.EmbeddingService") as mock_embedding_service,
+        patch("datasci_tool.pipeline.SummaryGenerator"),
+    ):
+        mock_research = mock_research_agent.return_value.research
+        mock_embedding = mock_embedding_service.return_value
+        mock_embedding.embed.side_effect = lambda texts: np.array(
+            [vectors[text] for text in texts], dtype=np.float32
+        )
+        pipeline = ResearchPipeline(
+            config,
+            client=Mock(),
+            persist_path=tmp_path / "vectors.json",
+        )
+
+        mock_research.return_value = [snippet_a, snippet_a]
+        first = pipeline.run("query")
+        mock_research.return_value = [snippet_a, snippet_b]
+        second = pipeline.run("query")
+
+    assert first.snippets == [snippet_a]
+    assert second.snippets == [snippet_a, snippet_b]
+    assert [call.args[0] for call in mock_embedding.embed.call_args_list] == [
+        ["query", "Notes A"],
+        ["query", "Notes B"],
+    ]
+    assert len(pipeline.vector_store) == 2
+    assert "https://example.com/b" in pipeline.vector_store
+
+
+def test_pipeline_serves_equivalent_queries_from_semantic_cache(tmp_path):
+    config = PipelineConfig()
+    config.vector_store = VectorStoreConfig(dimension=3, similarity_top_k=1)
+    snippet = ResearchSnippet(
+        title="Article A", url="https://example.com/a", content="Notes A", summary="A"
+    )
+    vectors = {
+        "Bayesian optimization": [1.0, 0.1, 0.0],
+        "BayesOpt overview": [1.0, 0.12, 0.0],
+        "Graph neural networks": [0.0, 0.0, 1.0],
+        "Notes A": [1.0, 0.0, 0.0],
+    }
+
+    with (
+        patch("datasci_tool.pipeline.ResearchAgent") as mock_research_agent,
+        patch("datasci_tool.pipeline.EmbeddingService") as mock_embedding_service,
+        patch("datasci_tool.pipeline.SummaryGenerator") as mock_summary_generator,
+    ):
+        mock_research = mock_research_agent.return_value.research
+        mock_research.return_value = [snippet]
+        mock_embedding_service.return_value.embed.side_effect = lambda texts: np.array(
+            [vectors[text] for text in texts], dtype=np.float32
+        )
+        mock_summary_generator.return_value.summarize.return_value = "final summary"
+        pipeline = ResearchPipeline(
+            config,
+            client=Mock(),
+            persist_path=tmp_path / "vectors.json",
+        )
+
+        first = pipeline.run("Bayesian optimization")
+        cached = pipeline.run("BayesOpt overview")
+        mock_research.return_value = []
+        unrelated = pipeline.run("Graph neural networks")
+
+    assert mock_research.call_count == 2
+    assert cached.query == "BayesOpt overview"
+    assert cached.snippets == first.snippets == [snippet]
+    assert cached.summary == "final summary"
+    assert cached.similar_documents == first.similar_documents
+    assert unrelated.snippets == []
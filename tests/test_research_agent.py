@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from datasci_tool.config import AgentConfig
+from datasci_tool.research_agent import ResearchAgent, ResearchSnippet
+
+
+def _agent_streaming(chunks: list[str]) -> ResearchAgent:
+    client = MagicMock()
+    events = [SimpleNamespace(type="response.output_text.delta", delta=chunk) for chunk in chunks]
+    events.append(SimpleNamespace(type="response.completed"))
+    stream = client.responses.stream.return_value.__enter__.return_value
+    stream.__iter__.return_value = iter(events)
+    return ResearchAgent(AgentConfig(), client=client)
+
+
+def test_research_parses_snippets_split_across_deltas():
+    payload = json.dumps(
+        [
+            {"title": "A", "url": "https://a", "summary": "sa", "content": "ca, [x]"},
+            {"title": "B", "body": "cb"},
+        ]
+    )
+    chunks = [payload[idx : idx + 7] for idx in range(0, len(payload), 7)]
+
+    snippets = _agent_streaming(["  ", *chunks]).research("topic")
+
+    assert snippets == [
+        ResearchSnippet(title="A", url="https://a", content="ca, [x]", summary="sa"),
+        ResearchSnippet(title="B", url="", content="cb", summary=""),
+    ]
+
+
+def test_iter_research_yields_before_the_array_closes():
+    agent = _agent_streaming(['[{"title": "A"}, ', '{"title": "B"', "}]"])
+
+    snippets = agent.iter_research("topic")
+
+    assert next(snippets).title == "A"
+    assert [snippet.title for snippet in snippets] == ["B"]
+
+
+def test_research_rejects_truncated_json():
+    agent = _agent_streaming(['[{"title": "A"}, {"title": '])
+
+    with pytest.raises(RuntimeError, match="not valid JSON"):
+        agent.research("topic")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import numpy as np
+
+from datasci_tool.semantic_cache import SemanticCache
+
+
+def test_lookup_respects_threshold_and_ttl(tmp_path):
+    now = [1_000.0]
+    cache = SemanticCache(
+        tmp_path / "cache.json",
+        vector_dimension=3,
+        threshold=0.95,
+        ttl_seconds=60,
+        clock=lambda: now[0],
+    )
+    cache.add("bayesian optimisation", [1.0, 0.0, 0.0], {"summary": "cached"})
+
+    assert cache.lookup([1.0, 0.05, 0.0]) == {"summary": "cached"}
+    assert cache.lookup([0.5, 0.5, 0.0]) is None
+
+    now[0] += 61
+    assert cache.lookup([1.0, 0.05, 0.0]) is None
+
+    reloaded = SemanticCache(tmp_path / "cache.json", vector_dimension=3, ttl_seconds=None)
+    assert reloaded.lookup([1.0, 0.0, 0.0]) == {"summary": "cached"}
+
+
+def test_expired_entries_are_evicted_and_same_query_is_replaced(tmp_path):
+    now = [1_000.0]
+    cache = SemanticCache(
+        tmp_path / "cache.json",
+        vector_dimension=3,
+        threshold=0.95,
+        ttl_seconds=60,
+        clock=lambda: now[0],
+    )
+    for idx in range(5):
+        cache.add(f"stale {idx}", [1.0, 0.001 * idx, 0.0], {"summary": f"stale {idx}"})
+    now[0] += 30
+    fresh = np.array([1.0, 0.2, 0.0])
+    cache.add("fresh", fresh, {"summary": "fresh"})
+    now[0] += 40
+
+    # The expired near-duplicates outrank the fresh entry but must not hide it.
+    assert cache.lookup([1.0, 0.0, 0.0], candidates=5) == {"summary": "fresh"}
+
+    cache.add("fresh", fresh, {"summary": "refreshed"})
+
+    assert [doc.text for doc in cache.store.documents] == ["fresh"]
+    assert cache.lookup(fresh) == {"summary": "refreshed"}
+    reloaded = SemanticCache(tmp_path / "cache.json", vector_dimension=3, ttl_seconds=None)
+    assert [doc.metadata["payload"] for doc in reloaded.store.documents] == [
+        {"summary": "refreshed"}
+    ]
@@ -0,0 +1,524 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from datasci_tool import _json, vector_store
+from datasci_tool.vector_store import (
+    LocalVectorStore,
+    StoredDocument,
+    _sq8_dot_kernel,
+    _top_k_indices,
+)
+
+
+def _document(document_id: str, embedding: list[float]) -> StoredDocument:
+    return StoredDocument(
+        document_id=document_id,
+        text=f"text for {document_id}",
+        metadata={"title": document_id},
+        embedding=np.asarray(embedding, dtype=np.float32),
+    )
+
+
+def test_query_ranks_by_cosine_similarity(tmp_path):
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=3)
+    store.add(
+        [
+            _document("a", [1.0, 0.0, 0.0]),
+            _document("b", [0.0, 1.0, 0.0]),
+            _document("c", [0.7, 0.7, 0.0]),
+            _document("zero", [0.0, 0.0, 0.0]),
+        ]
+    )
+
+    results = store.query([1.0, 0.1, 0.0], top_k=2)
+
+    assert [doc.document_id for doc in results] == ["a", "c"]
+
+
+def test_store_reloads_persisted_documents(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document("a", [1.0, 0.0, 0.0]), _document("b", [0.0, 1.0, 0.0])])
+
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+
+    assert len(reloaded) == 2
+    assert [doc.document_id for doc in reloaded.query([0.0, 1.0, 0.0], top_k=1)] == ["b"]
+
+
+def test_embeddings_are_persisted_as_npy_and_appended(tmp_path):
+    path = tmp_path / "vectors.json"
+    store = LocalVectorStore(path, vector_dimension=3)
+    store.add([_document("a", [1.0, 0.0, 0.0])])
+    store.flush()
+    store.add([_document("b", [0.0, 1.0, 0.0]), _document("c", [0.0, 0.0, 1.0])])
+    store.flush()
+
+    matrix = np.load(store.embeddings_path)
+    payload = json.loads(path.read_text(encoding="utf-8"))
+
+    assert matrix.dtype == np.float32
+    assert matrix.tolist() == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    assert [item["document_id"] for item in payload["documents"]] == ["a", "b", "c"]
+    assert all("embedding" not in item for item in payload["documents"])
+
+
+def test_legacy_json_store_is_still_readable(tmp_path):
+    path = tmp_path / "vectors.json"
+    legacy = {
+        "documents": [
+            {"document_id": "a", "text": "A", "metadata": {}, "embedding": [1.0, 0.0, 0.0]},
+            {"document_id": "b", "text": "B", "metadata": {}, "embedding": [0.0, 1.0, 0.0]},
+        ]
+    }
+    path.write_text(json.dumps(legacy), encoding="utf-8")
+
+    store = LocalVectorStore(path, vector_dimension=3)
+
+    assert [doc.document_id for doc in store.query([0.0, 1.0, 0.0], top_k=1)] == ["b"]
+
+
+def test_quantized_scores_match_float32_ranking(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16)).astype(np.float32)
+    documents = [_document(str(idx), row.tolist()) for idx, row in enumerate(embeddings)]
+    quantized = LocalVectorStore(tmp_path / "q8.json", vector_dimension=16, quantize=True)
+    exact = LocalVectorStore(tmp_path / "fp32.json", vector_dimension=16)
+    quantized.add(documents)
+    exact.add(documents)
+    query = rng.normal(size=16).astype(np.float32)
+
+    assert quantized._q8.to_array().dtype == np.int8 and quantized._vectors is None
+    np.testing.assert_allclose(
+        quantized._score(query), exact._score(query), atol=0.02
+    )
+    assert quantized.query(query.tolist(), top_k=1) == exact.query(query.tolist(), top_k=1)
+
+
+def test_quantized_scores_without_numba_match_the_kernel(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    embeddings = rng.normal(size=(300, 16)).astype(np.float32)
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=16, quantize=True)
+    store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    query = rng.normal(size=16).astype(np.float32)
+    expected = store._score(query)
+
+    monkeypatch.setattr(vector_store, "_sq8_dot_kernel", lambda: None)
+    monkeypatch.setattr(vector_store, "_SQ8_BLOCK_BYTES", 16 * 4 * 64)
+
+    np.testing.assert_allclose(store._score(query), expected, atol=0.02)
+
+
+def test_quantized_codes_are_persisted_and_memory_mapped(tmp_path, monkeypatch):
+    rng = np.random.default_rng(4)
+    embeddings = rng.normal(size=(20, 8)).astype(np.float32)
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=8, quantize=True) as store:
+        store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    query = rng.normal(size=8).astype(np.float32)
+    expected = store._score(query)
+    # The int8 codes replace the float32 matrix rather than duplicating it.
+    assert not store.embeddings_path.exists()
+
+    quantize_sq8 = vector_store._quantize_sq8
+
+    def no_recompute(rows):
+        assert len(rows) == 0, "codes should be loaded, not recomputed"
+        return quantize_sq8(rows)
+
+    monkeypatch.setattr(vector_store, "_quantize_sq8", no_recompute)
+    reloaded = LocalVectorStore(path, vector_dimension=8, quantize=True)
+
+    assert np.load(store.quantized_path).dtype == np.int8
+    assert isinstance(reloaded._q8.base, np.memmap)
+    assert isinstance(reloaded._scales.base, np.memmap)
+    np.testing.assert_array_equal(reloaded._q8.segments(slice(None))[0], store._q8.to_array())
+    monkeypatch.undo()
+    np.testing.assert_allclose(reloaded._score(query), expected, rtol=1e-6)
+
+
+def test_reopening_with_the_other_quantize_setting_converts_the_store(tmp_path):
+    rng = np.random.default_rng(6)
+    embeddings = rng.normal(size=(20, 8)).astype(np.float32)
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=8) as store:
+        store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    query = rng.normal(size=8).astype(np.float32)
+    expected = store._score(query)
+
+    quantized = LocalVectorStore(path, vector_dimension=8, quantize=True)
+    np.testing.assert_allclose(quantized._score(query), expected, atol=0.02)
+    quantized.compact()
+    assert quantized.quantized_path.exists() and not quantized.embeddings_path.exists()
+
+    exact = LocalVectorStore(path, vector_dimension=8)
+    assert exact._q8 is None and exact._vectors.base.dtype == np.float32
+    np.testing.assert_allclose(exact._score(query), expected, atol=0.02)
+
+
+def test_hnsw_index_is_used_above_threshold(tmp_path):
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(40, 8)).astype(np.float32)
+    documents = [_document(str(idx), row.tolist()) for idx, row in enumerate(embeddings)]
+    path = tmp_path / "vectors.json"
+    store = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20)
+    store.add(documents[:10])
+    assert store._hnsw is None
+    store.add(documents[10:])
+
+    assert store._hnsw is not None and store._hnsw.ntotal == 40
+    assert store.query(embeddings[7].tolist(), top_k=1)[0].document_id == "7"
+    store.flush()
+
+    reloaded = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20)
+    assert reloaded._hnsw is not None and reloaded._hnsw.ntotal == 40
+    assert reloaded.query(embeddings[3].tolist(), top_k=1)[0].document_id == "3"
+
+
+def test_hnsw_index_built_during_wal_flushes_is_persisted(tmp_path, monkeypatch):
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(5)
+    embeddings = rng.normal(size=(26, 8)).astype(np.float32)
+    documents = [_document(str(idx), row.tolist()) for idx, row in enumerate(embeddings)]
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20) as store:
+        store.add(documents[:15])
+    with LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20) as store:
+        store.add(documents[15:25])
+    assert store.embeddings_wal_path.exists()
+    assert store.index_path.exists()
+
+    def no_rebuild(self, faiss):
+        raise AssertionError("the persisted index should be reused")
+
+    monkeypatch.setattr(LocalVectorStore, "_new_hnsw_index", no_rebuild)
+    with LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20) as store:
+        assert store._hnsw.ntotal == 25
+        store.add(documents[25:])
+
+    reloaded = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=20)
+    assert reloaded._hnsw.ntotal == 26
+    assert reloaded.query(embeddings[25].tolist(), top_k=1)[0].document_id == "25"
+
+
+def test_hnsw_index_is_only_written_once_its_rows_are_flushed(tmp_path):
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(9)
+    first, second = rng.normal(size=(2, 10, 8)).astype(np.float32)
+    path = tmp_path / "vectors.json"
+    store = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10)
+    store.add([_document(f"a-{idx}", row) for idx, row in enumerate(first[:5])])
+    store.flush()
+    # Crossing the threshold builds the index in memory only.
+    store.add([_document(f"b-{idx}", row) for idx, row in enumerate(second)])
+    assert store._hnsw is not None and not store.index_path.exists()
+
+    reloaded = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10)
+    assert reloaded._hnsw is None
+    assert reloaded.query(second[3], top_k=1)[0].document_id.startswith("a-")
+    store.flush()
+    assert store.index_path.exists()
+    reloaded = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10)
+    assert reloaded.query(second[3], top_k=1)[0].document_id == "b-3"
+
+
+def test_hnsw_index_that_disagrees_with_its_record_is_rebuilt(tmp_path):
+    faiss = pytest.importorskip("faiss")
+    embeddings = np.random.default_rng(10).normal(size=(12, 8)).astype(np.float32)
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10) as store:
+        store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    stale = faiss.IndexHNSWFlat(8, 32, faiss.METRIC_INNER_PRODUCT)
+    stale.add(np.ascontiguousarray(embeddings[::-1][:6]))
+    faiss.write_index(stale, str(store.index_path))
+
+    reloaded = LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10)
+
+    assert reloaded._hnsw.ntotal == 12
+    assert reloaded.query(embeddings[2].tolist(), top_k=1)[0].document_id == "2"
+
+
+def test_quantized_hnsw_index_encodes_rows_added_after_it_was_built(tmp_path):
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(7)
+    # The first rows barely use the later axes; a trained 8-bit index would clip them.
+    early = np.eye(1, 8) + 0.01 * rng.normal(size=(10, 8))
+    store = LocalVectorStore(
+        tmp_path / "vectors.json", vector_dimension=8, quantize=True, hnsw_threshold=10
+    )
+    store.add([_document(str(idx), row) for idx, row in enumerate(early)])
+    store.add([_document("late", [0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])])
+
+    document, score = store.search([0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], top_k=1)[0]
+    assert document.document_id == "late" and score == pytest.approx(1.0, abs=0.01)
+
+
+def test_hnsw_index_of_another_kind_is_rebuilt(tmp_path):
+    faiss = pytest.importorskip("faiss")
+    embeddings = np.random.default_rng(8).normal(size=(12, 8)).astype(np.float32)
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=8, hnsw_threshold=10) as store:
+        store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    assert isinstance(store._hnsw, faiss.IndexHNSWFlat)
+
+    reloaded = LocalVectorStore(path, vector_dimension=8, quantize=True, hnsw_threshold=10)
+
+    assert isinstance(reloaded._hnsw, faiss.IndexHNSWSQ) and reloaded._hnsw.ntotal == 12
+    assert reloaded.query(embeddings[4].tolist(), top_k=1)[0].document_id == "4"
+
+
+def test_add_defers_writes_until_flush(tmp_path):
+    path = tmp_path / "vectors.json"
+    store = LocalVectorStore(path, vector_dimension=3)
+    store.add([_document("a", [1.0, 0.0, 0.0])])
+    assert not path.exists()
+
+    store.close()
+
+    assert len(LocalVectorStore(path, vector_dimension=3)) == 1
+
+
+def test_add_rejects_mismatched_dimensions(tmp_path):
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=3)
+
+    with pytest.raises(ValueError, match="Embedding for b has length 2"):
+        store.add([_document("a", [1.0, 0.0, 0.0]), _document("b", [1.0, 0.0])])
+    assert len(store) == 0
+
+
+def test_flush_appends_to_wal_and_compact_folds_it_back(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, [1.0, 0.0, 0.0]) for name in ("a", "b", "c")])
+    compacted = path.read_bytes()
+
+    store = LocalVectorStore(path, vector_dimension=3)
+    store.add([_document("d", [0.0, 0.0, 1.0])])
+    store.flush()
+
+    assert path.read_bytes() == compacted
+    assert store.embeddings_wal_path.exists()
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "b", "c", "d"]
+    assert reloaded.query([0.0, 0.0, 1.0], top_k=1)[0].document_id == "d"
+
+    reloaded.compact()
+
+    assert not reloaded.embeddings_wal_path.exists()
+    assert not reloaded.metadata_wal_path.exists()
+    assert len(LocalVectorStore(path, vector_dimension=3)) == 4
+
+
+def test_torn_wal_record_is_discarded(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, [1.0, 0.0, 0.0]) for name in ("a", "b")])
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document("c", [0.0, 1.0, 0.0])])
+    with store.embeddings_wal_path.open("ab") as file:
+        file.write(b"\x05\x00par")
+
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "b", "c"]
+    assert not reloaded.embeddings_wal_path.exists()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_metadata_record_torn_inside_a_utf8_character_is_discarded(
+    tmp_path, monkeypatch, use_orjson
+):
+    if not use_orjson:
+        monkeypatch.setattr(_json, "orjson", None)
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, [1.0, 0.0, 0.0]) for name in ("a", "b")])
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document("c", [0.0, 1.0, 0.0])])
+    with store.metadata_wal_path.open("ab") as file:
+        file.write('{"document_id": "caf\u00e9'.encode("utf-8")[:-1])
+
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "b", "c"]
+
+
+def test_orphaned_embeddings_log_is_discarded(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, [1.0, 0.0, 0.0]) for name in ("a", "b", "c")])
+    # Simulate a crash after the embeddings log was written but before the
+    # metadata log was created.
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document("d", [0.0, 1.0, 0.0])])
+    store.metadata_wal_path.unlink()
+
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        assert [doc.document_id for doc in store.documents] == ["a", "b", "c"]
+        store.add([_document("e", [0.0, 0.0, 1.0])])
+
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "b", "c", "e"]
+
+
+def test_discard_marks_rows_dead_until_compaction(tmp_path):
+    path = tmp_path / "vectors.json"
+    vectors = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0], "c": [0.0, 0.0, 1.0]}
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, vector) for name, vector in vectors.items()])
+    store = LocalVectorStore(path, vector_dimension=3)
+    store.add([_document("d", [0.0, 1.0, 0.0])])
+    store.flush()
+
+    store.discard(["b", "d", "missing"])
+    store.flush()
+
+    assert [doc.document_id for doc in store.documents] == ["a", "c"]
+    assert len(store) == 2 and "b" not in store and store.get("c").document_id == "c"
+    assert {doc.document_id for doc in store.query([0.0, 1.0, 0.0], top_k=5)} == {"a", "c"}
+    # The removal is only logged; the compacted files still hold every row.
+    assert len(np.load(store.embeddings_path)) == 3
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "c"]
+
+    reloaded.compact()
+
+    assert len(np.load(reloaded.embeddings_path)) == 2
+    assert not reloaded.embeddings_wal_path.exists()
+    compacted = LocalVectorStore(path, vector_dimension=3)
+    assert [doc.document_id for doc in compacted.documents] == ["a", "c"]
+    for name in ("a", "c"):
+        assert compacted.query(vectors[name], top_k=1)[0].document_id == name
+
+
+def test_discarded_rows_are_skipped_by_the_hnsw_index(tmp_path):
+    pytest.importorskip("faiss")
+    embeddings = np.random.default_rng(2).normal(size=(8, 4)).astype(np.float32)
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=4, hnsw_threshold=2)
+    store.add([_document(str(idx), row.tolist()) for idx, row in enumerate(embeddings)])
+    assert store._hnsw is not None
+
+    store.discard(["3"])
+
+    results = store.query(embeddings[3].tolist(), top_k=8)
+    assert len(results) == 7 and "3" not in {doc.document_id for doc in results}
+
+
+def test_interrupted_compaction_keeps_the_previous_generation(tmp_path, monkeypatch):
+    path = tmp_path / "vectors.json"
+    vectors = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0], "c": [0.0, 0.0, 1.0]}
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, vector) for name, vector in vectors.items()])
+    replace = vector_store.os.replace
+
+    def fail_on_json(src, dst):
+        if Path(dst) == path:
+            raise OSError("disk full")
+        replace(src, dst)
+
+    monkeypatch.setattr(vector_store.os, "replace", fail_on_json)
+    store = LocalVectorStore(path, vector_dimension=3)
+    store.discard(["a"])
+    with pytest.raises(OSError, match="disk full"):
+        store.compact()
+    monkeypatch.undo()
+
+    reloaded = LocalVectorStore(path, vector_dimension=3)
+    assert [doc.document_id for doc in reloaded.documents] == ["a", "b", "c"]
+    for name, vector in vectors.items():
+        assert reloaded.query(vector, top_k=1)[0].document_id == name
+
+
+def test_matrix_that_disagrees_with_the_json_is_rejected(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3) as store:
+        store.add([_document(name, [1.0, 0.0, 0.0]) for name in ("a", "b", "c")])
+    np.save(store.embeddings_path, np.eye(3, dtype=np.float32)[:2])
+
+    with pytest.raises(ValueError, match="holds 2 rows but .* lists 3 documents"):
+        LocalVectorStore(path, vector_dimension=3)
+
+
+def test_stored_vectors_are_unit_normalised(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3, quantize=False) as store:
+        store.add([_document("a", [3.0, 4.0, 0.0]), _document("zero", [0.0, 0.0, 0.0])])
+
+    matrix = np.load(store.embeddings_path)
+
+    np.testing.assert_allclose(matrix, [[0.6, 0.8, 0.0], [0.0, 0.0, 0.0]], rtol=1e-6)
+    np.testing.assert_allclose(store._score(np.array([0.0, 2.0, 0.0])), [0.8, 0.0], rtol=1e-6)
+
+
+def test_numba_sq8_kernel_matches_numpy():
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(2)
+    matrix = rng.integers(-127, 128, size=(64, 32), dtype=np.int8)
+    query = rng.integers(-127, 128, size=32, dtype=np.int8)
+
+    np.testing.assert_array_equal(
+        _sq8_dot_kernel()(matrix, query), matrix @ query.astype(np.int32)
+    )
+
+
+def test_top_k_indices_orders_best_first_and_breaks_ties_by_position():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, -0.1], dtype=np.float32)
+
+    assert _top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert _top_k_indices(scores, 10).tolist() == [1, 3, 2, 0, 4]
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_tiled_scan_matches_single_pass(tmp_path, monkeypatch, quantize):
+    monkeypatch.setattr(vector_store, "_sq8_dot_kernel", lambda: None)
+    rng = np.random.default_rng(3)
+    embeddings = rng.normal(size=(200, 8)).astype(np.float32)
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=8, quantize=quantize)
+    store.add([_document(str(idx), row) for idx, row in enumerate(embeddings)])
+    query = rng.normal(size=8).astype(np.float32)
+    expected = [doc.document_id for doc in store.query(query, top_k=5)]
+
+    monkeypatch.setattr(vector_store, "_TILED_SCAN_MIN_ROWS", 100)
+    monkeypatch.setattr(vector_store, "_TILE_BYTES", 8 * 4 * 16)
+    monkeypatch.setattr(vector_store.os, "cpu_count", lambda: 4)
+
+    assert store._use_tiled_scan()
+    assert [doc.document_id for doc in store.query(query, top_k=5)] == expected
+
+
+def test_documents_hold_read_only_views_into_the_matrix(tmp_path):
+    store = LocalVectorStore(tmp_path / "vectors.json", vector_dimension=3)
+    for name in "abcde":
+        store.add([_document(name, [1.0, 2.0, 2.0])])
+
+    documents = store.documents
+
+    assert all(np.shares_memory(doc.embedding, store._vectors.tail) for doc in documents)
+    assert not documents[0].embedding.flags.writeable
+    np.testing.assert_allclose(documents[-1].embedding, [1 / 3, 2 / 3, 2 / 3], rtol=1e-6)
+    assert hash(documents[0]) == hash("a")
+    with pytest.raises(AttributeError):
+        documents[0].text = "changed"
+
+
+def test_appends_grow_the_quantized_arrays_geometrically(tmp_path):
+    path = tmp_path / "vectors.json"
+    with LocalVectorStore(path, vector_dimension=3, quantize=True) as store:
+        store.add([_document("base", [0.0, 0.0, 1.0])])
+    store = LocalVectorStore(path, vector_dimension=3, quantize=True)
+    tails = []
+    for idx in range(64):
+        store.add([_document(str(idx), [1.0, float(idx), 0.0])])
+        tails.append((store._q8._tail, store._scales._tail))
+
+    assert all(len({id(tail[part]) for tail in tails}) <= 8 for part in range(2))
+    assert np.shares_memory(store.documents[0].embedding, store._q8.base)
+    assert all(np.shares_memory(doc.embedding, store._q8.tail) for doc in store.documents[1:])
+    assert len(store._q8) == len(store._scales) == 65
+    assert store.query([1.0, 0.0, 0.0], top_k=1)[0].document_id == "0"